@@ -1,57 +1,269 @@
-from flask import Flask, request, jsonify, send_from_directory
+import os
+
+# Let the CUDA caching allocator grow segments instead of fragmenting on variable shapes;
+# this has to be set before torch is imported
+os.environ.setdefault('PYTORCH_CUDA_ALLOC_CONF', 'expandable_segments:True')
+
+from flask import Flask, Response, request, jsonify, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from transformers import AutoTokenizer, AutoModel
 import torch
 import numpy as np
 import pandas as pd
+import io
 import json
-import os
+import functools
+import hashlib
+import importlib.util
+import queue
+import sqlite3
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
 from werkzeug.utils import secure_filename
 import logging
-from datetime import datetime, timedelta
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import IsolationForest, RandomForestRegressor
-import requests
+from datetime import datetime
+from sklearn.ensemble import IsolationForest
 from requests.exceptions import ConnectionError
 from dotenv import load_dotenv
-from sklearn.linear_model import LinearRegression
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Only probe for calamine here; pandas imports the Excel engine itself when a spreadsheet is first read
+EXCEL_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') is not None else None
 
 # Load environment variables
 load_dotenv()
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Parse request bodies and serialize jsonify responses with orjson, which also encodes NumPy arrays natively"""
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        # Decode errors subclass ValueError, so request.get_json still answers malformed bodies with 400
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option), mimetype=self.mimetype
+        )
+
+def _numpy_default(obj):
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    return DefaultJSONProvider.default(obj)
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+else:
+    # Without orjson, the stdlib encoder converts NumPy values itself so jsonify accepts them either way
+    app.json.default = _numpy_default
+# Skip the key sort and keep responses compact even in debug mode (orjson never does either)
+app.json.sort_keys = False
+app.json.compact = True
 # Configure CORS to allow requests from any localhost port
 CORS(app, resources={r"/api/*": {"origins": [
     "http://localhost:3000",
     os.getenv('FRONTEND_URL', 'http://localhost:3000')
 ]}})
 
+# Compress JSON responses (embedding payloads shrink about 3x) for clients that accept it
+if Compress is not None:
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    Compress(app)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Initialize the model and tokenizer with error handling
 MODEL_NAME = os.getenv('MODEL_NAME', 'bert-base-uncased')
+# 'torch' runs the PyTorch model eagerly, 'torchscript' runs traced graphs per sequence length bucket,
+# 'onnx' serves an exported graph through ONNX Runtime
+INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'torch').lower()
+ONNX_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.getenv('ONNX_MODEL_DIR', 'onnx_models'))
+# Store Linear weights as int8 and run them through VNNI/int8 GEMM kernels
+QUANTIZE_MODEL = os.getenv('QUANTIZE_MODEL', 'false').lower() in ('1', 'true', 'yes')
+# Run representative shapes through the model at startup so the first requests hit warm kernels
+WARMUP_MODEL = os.getenv('WARMUP_MODEL', 'true').lower() in ('1', 'true', 'yes')
+# Load the model on a background thread after startup instead of while the module is imported
+LAZY_MODEL_LOAD = os.getenv('LAZY_MODEL_LOAD', 'false').lower() in ('1', 'true', 'yes')
+# Run on the GPU when one is available
+DEVICE = torch.device(os.getenv('DEVICE', 'cuda' if torch.cuda.is_available() else 'cpu'))
 tokenizer = None
 model = None
+embedding_dim = 768
+# Tokenizer call with its keyword arguments bound once, set by initialize_model
+encode_ids = None
+inference_backend = 'torch'
+# Set once initialize_model has finished, whether or not the model could be loaded
+model_ready = threading.Event()
+
+# Use every core for intra-op GEMMs and keep inter-op scheduling single-threaded
+torch.set_num_threads(int(os.getenv('TORCH_NUM_THREADS', os.cpu_count() or 1)))
+try:
+    torch.set_num_interop_threads(1)
+except RuntimeError:
+    # Already fixed once parallel work has started in this process
+    pass
 
-def initialize_model():
-    global tokenizer, model
+class ClsEncoder(torch.nn.Module):
+    """Wrap a Hugging Face encoder so it takes plain tensors and returns only the [CLS] vectors"""
+
+    def __init__(self, encoder):
+        super().__init__()
+        self.encoder = encoder
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        outputs = self.encoder(input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids)
+        return outputs.last_hidden_state[:, 0]
+
+def load_onnx_session(torch_model):
+    """Export `torch_model` to ONNX once and open an optimized ONNX Runtime session on it"""
+    if ort is None:
+        raise RuntimeError("onnxruntime is not installed")
+
+    onnx_path = os.path.join(ONNX_MODEL_DIR, f"{MODEL_NAME.replace('/', '_')}.onnx")
+    if not os.path.exists(onnx_path):
+        os.makedirs(ONNX_MODEL_DIR, exist_ok=True)
+        logger.info("Exporting %s to %s...", MODEL_NAME, onnx_path)
+        dummy = tokenizer(["warmup"], return_tensors="pt")
+        input_names = ['input_ids', 'attention_mask', 'token_type_ids']
+        torch.onnx.export(
+            ClsEncoder(torch_model).eval(),
+            tuple(dummy[name] for name in input_names),
+            onnx_path,
+            input_names=input_names,
+            output_names=['cls_embedding'],
+            dynamic_axes={
+                **{name: {0: 'batch', 1: 'sequence'} for name in input_names},
+                'cls_embedding': {0: 'batch'},
+            },
+            opset_version=17,
+        )
+
+    if QUANTIZE_MODEL:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized_path = onnx_path[:-len('.onnx')] + '.int8.onnx'
+        if not os.path.exists(quantized_path):
+            logger.info("Quantizing %s to int8...", onnx_path)
+            quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QInt8)
+        onnx_path = quantized_path
+
+    # Let ORT fuse attention, LayerNorm and GELU into single kernels
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    providers = ['CPUExecutionProvider']
+    if DEVICE.type == 'cuda' and 'CUDAExecutionProvider' in ort.get_available_providers():
+        providers.insert(0, 'CUDAExecutionProvider')
+    return ort.InferenceSession(onnx_path, options, providers=providers)
+
+def initialize_model(warmup=WARMUP_MODEL):
+    global tokenizer, model, embedding_dim, inference_backend, encode_ids, _embedding_cache_variant
     try:
+        # transformers is slow to import, so only pay for it once a model is actually loaded
+        from transformers import AutoTokenizer, AutoModel
+
         logger.info("Attempting to download model from Hugging Face...")
         tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-        model = AutoModel.from_pretrained(MODEL_NAME)
-        logger.info("Model successfully loaded")
+        if not tokenizer.is_fast:
+            logger.warning("No fast (Rust) tokenizer available for %s, tokenization will be slower", MODEL_NAME)
+        encode_ids = functools.partial(
+            tokenizer, truncation=True, max_length=MAX_SEQUENCE_LENGTH,
+            return_attention_mask=False, return_token_type_ids=False
+        )
+        try:
+            # Fused scaled-dot-product attention kernels (the successor to BetterTransformer)
+            model = AutoModel.from_pretrained(MODEL_NAME, attn_implementation="sdpa")
+        except ValueError:
+            # Architecture without an SDPA implementation
+            model = AutoModel.from_pretrained(MODEL_NAME)
+        embedding_dim = model.config.hidden_size
+        inference_backend = 'torch'
+        weights_dtype = 'float32'
+        if INFERENCE_BACKEND == 'onnx':
+            try:
+                model = load_onnx_session(model)
+                inference_backend = 'onnx'
+                if QUANTIZE_MODEL:
+                    weights_dtype = 'int8'
+            except Exception as e:
+                logger.error("Error loading ONNX Runtime session, using PyTorch instead: %s", e)
+        elif INFERENCE_BACKEND == 'torchscript':
+            inference_backend = 'torchscript'
+        if inference_backend != 'onnx':
+            if QUANTIZE_MODEL and DEVICE.type == 'cpu':
+                # Dynamic quantization needs no calibration data
+                model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                weights_dtype = 'int8'
+            elif DEVICE.type == 'cuda':
+                # Half-precision weights halve memory traffic; embeddings are upcast to float32 on the way out
+                model.half()
+                weights_dtype = 'float16'
+            model.to(DEVICE).eval()
+        _embedding_cache_variant = f"{MODEL_NAME}\0{inference_backend}\0{weights_dtype}"
+        clear_embedding_cache()
+        _traced_encoders.clear()
+        logger.info("Model successfully loaded (%s backend on %s)", inference_backend, DEVICE)
+        if warmup:
+            warmup_model()
     except ConnectionError as e:
-        logger.error(f"Connection error while downloading model: {str(e)}")
+        logger.error("Connection error while downloading model: %s", e)
         logger.info("Using fallback simple tokenization...")
         # Fallback to simple tokenization
         tokenizer = None
         model = None
     except Exception as e:
-        logger.error(f"Error initializing model: {str(e)}")
+        logger.error("Error initializing model: %s", e)
         tokenizer = None
         model = None
+    finally:
+        model_ready.set()
+
+_model_loader_pid = None
+_model_loader_lock = threading.Lock()
+
+def start_model_loading(warmup=WARMUP_MODEL):
+    """Run initialize_model on a background thread, once per process"""
+    global _model_loader_pid
+    # Threads do not survive fork, so each gunicorn worker starts its own loader
+    if _model_loader_pid != os.getpid():
+        with _model_loader_lock:
+            if _model_loader_pid != os.getpid():
+                threading.Thread(target=initialize_model, args=(warmup,), name='model-loader', daemon=True).start()
+                _model_loader_pid = os.getpid()
 
 # Configure upload folder
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.getenv('UPLOAD_FOLDER', 'uploads'))
@@ -62,35 +274,520 @@ app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = set(os.getenv('ALLOWED_EXTENSIONS', 'csv,json,xls,xlsx').split(','))
+# Formats the processed data can be written back in, with the extension of the file written;
+# pandas can no longer write legacy .xls, so spreadsheets are always written as .xlsx
+OUTPUT_FORMATS = {'csv': '.csv', 'json': '.json', 'xls': '.xlsx', 'xlsx': '.xlsx', 'parquet': '.parquet'}
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def get_embeddings(text):
+_sqlite_connections = threading.local()
+
+def sqlite_connection(path, schema):
+    """Return this thread's connection to the SQLite file at `path`, creating `schema` on first use"""
+    # sqlite3 connections cannot be shared between threads, so each thread opens its own
+    connections = getattr(_sqlite_connections, 'by_path', None)
+    if connections is None:
+        connections = _sqlite_connections.by_path = {}
+    connection = connections.get(path)
+    if connection is None:
+        connection = sqlite3.connect(path, timeout=30)
+        # WAL lets readers in other workers proceed while one worker writes
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(schema)
+        connections[path] = connection
+    return connection
+
+# Below this size the pandas C parser finishes before Arrow's thread pool pays off
+PYARROW_CSV_MIN_BYTES = int(os.getenv('PYARROW_CSV_MIN_BYTES', 256 * 1024))
+
+def _source_size(source):
+    if isinstance(source, io.BytesIO):
+        return source.getbuffer().nbytes
+    return os.path.getsize(source)
+
+# Strings pandas reads as missing by default, so both parsers agree on which cells are null
+CSV_NULL_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+]
+
+def read_csv_file(source):
+    """Parse a CSV with Arrow's multithreaded reader into the same frame the pandas parser would build"""
+    if pacsv is not None and _source_size(source) >= PYARROW_CSV_MIN_BYTES:
+        try:
+            # Empty text cells and pandas' NA markers become nulls, so missing values do not
+            # depend on which reader the upload size picked; plain NumPy-backed columns keep
+            # select_dtypes(np.number) working downstream
+            convert_options = pacsv.ConvertOptions(null_values=CSV_NULL_VALUES, strings_can_be_null=True)
+            table = pacsv.read_csv(source, convert_options=convert_options)
+            names = table.column_names
+            # pandas renames duplicate headers to `a.1`, `a.2`, ...; leave such files to it
+            if len(set(names)) == len(names):
+                # pandas keeps dates and timestamps as text, so read those columns again as
+                # strings to keep their original spelling and their place among the categoricals
+                temporal = [field.name for field in table.schema if pa.types.is_temporal(field.type)]
+                if temporal:
+                    if hasattr(source, 'seek'):
+                        source.seek(0)
+                    convert_options.column_types = {name: pa.string() for name in temporal}
+                    table = pacsv.read_csv(source, convert_options=convert_options)
+                return table.to_pandas()
+        except Exception as e:
+            logger.warning("PyArrow could not parse the CSV, retrying with pandas: %s", e)
+        if hasattr(source, 'seek'):
+            source.seek(0)
+    return pd.read_csv(source)
+
+def read_excel_file(source):
+    """Parse a spreadsheet with the Rust calamine reader when it is installed"""
+    if EXCEL_ENGINE is not None:
+        try:
+            return pd.read_excel(source, engine=EXCEL_ENGINE)
+        except Exception as e:
+            logger.warning("%s could not parse the spreadsheet, retrying with the default engine: %s", EXCEL_ENGINE, e)
+            if hasattr(source, 'seek'):
+                source.seek(0)
+    return pd.read_excel(source)
+
+def write_processed_file(df, filepath, output_format):
+    """Write the processed frame in the requested format"""
+    # Identical uploads map to the same path, so each request writes its own partial file and
+    # renames it into place; the partial name keeps the extension pandas picks the Excel engine by
+    root, extension = os.path.splitext(filepath)
+    partial_path = f"{root}.{os.getpid()}-{threading.get_ident()}.part{extension}"
+    try:
+        if output_format == 'parquet':
+            df.to_parquet(partial_path, engine='pyarrow', compression='snappy', index=False)
+        elif output_format == 'csv':
+            # pandas rather than Arrow's CSV writer, which quotes every string and spells booleans
+            # and timestamps differently from the files clients already consume
+            df.to_csv(partial_path, index=False)
+        elif output_format == 'json':
+            df.to_json(partial_path, orient='records')
+        elif output_format in ['xls', 'xlsx']:
+            df.to_excel(partial_path, index=False)
+        os.replace(partial_path, filepath)
+    except Exception:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+def save_upload_in_background(raw, filepath):
+    """Persist the uploaded bytes without making the request wait for the disk write"""
+    def write():
+        # Write next to the target and rename it into place, so the file never appears half written
+        partial_path = f"{filepath}.part"
+        try:
+            with open(partial_path, 'wb') as f:
+                f.write(raw)
+            os.replace(partial_path, filepath)
+        except OSError as e:
+            logger.error("Error saving upload to %s: %s", filepath, e)
+
+    writer = threading.Thread(target=write, daemon=True)
+    writer.start()
+    return writer
+
+# Summaries of processed uploads keyed by a digest of the upload and its processing options,
+# so re-uploading the same dataset returns the previous result without parsing it again
+INGEST_CACHE_DB = os.getenv('INGEST_CACHE_DB', os.path.join(UPLOAD_FOLDER, 'ingest_cache.sqlite3'))
+INGEST_CACHE_SCHEMA = 'CREATE TABLE IF NOT EXISTS ingests (key TEXT PRIMARY KEY, summary TEXT NOT NULL)'
+
+def ingest_cache_key(raw, data_type, output_format, preprocessing_steps):
+    digest = hashlib.blake2b(raw, digest_size=16)
+    digest.update(json.dumps([data_type, output_format, preprocessing_steps], sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+def get_cached_ingest(key):
+    """Return the stored summary for `key` if its processed file still exists"""
+    if not INGEST_CACHE_DB:
+        return None
+    try:
+        row = sqlite_connection(INGEST_CACHE_DB, INGEST_CACHE_SCHEMA).execute(
+            'SELECT summary FROM ingests WHERE key = ?', (key,)
+        ).fetchone()
+    except sqlite3.Error as e:
+        logger.error("Error reading ingest cache: %s", e)
+        return None
+    if row is None:
+        return None
+    summary = json.loads(row[0])
+    return summary if os.path.exists(summary['file_path']) else None
+
+def put_cached_ingest(key, summary):
+    if not INGEST_CACHE_DB:
+        return
+    try:
+        connection = sqlite_connection(INGEST_CACHE_DB, INGEST_CACHE_SCHEMA)
+        with connection:
+            connection.execute('INSERT OR REPLACE INTO ingests (key, summary) VALUES (?, ?)', (key, json.dumps(summary)))
+    except sqlite3.Error as e:
+        logger.error("Error writing ingest cache: %s", e)
+
+# Serialized time series analyses cached in Redis, shared by every worker, for polling dashboards
+REDIS_URL = os.getenv('REDIS_URL')
+TIMESERIES_CACHE_TTL = int(os.getenv('TIMESERIES_CACHE_TTL', 30))
+_redis_client = None
+
+def get_redis_client():
+    """Return the shared Redis client, or None when no Redis server is configured"""
+    global _redis_client
+    if _redis_client is None and redis is not None and REDIS_URL and TIMESERIES_CACHE_TTL > 0:
+        # The client's connection pool opens connections on first use and resets itself after fork
+        _redis_client = redis.Redis.from_url(REDIS_URL)
+    return _redis_client
+
+def get_cached_response(key):
+    client = get_redis_client()
+    if client is None:
+        return None
+    try:
+        return client.get(key)
+    except redis.RedisError as e:
+        logger.error("Error reading response cache: %s", e)
+        return None
+
+def put_cached_response(key, payload):
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        client.setex(key, TIMESERIES_CACHE_TTL, payload)
+    except redis.RedisError as e:
+        logger.error("Error writing response cache: %s", e)
+
+# In-process LRU cache of [CLS] embeddings, keyed by a digest of the input text
+EMBEDDING_CACHE_SIZE = int(os.getenv('EMBEDDING_CACHE_SIZE', 4096))
+# Largest number of texts run through the model in a single forward pass
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 32))
+_embedding_cache = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+# Model name, backend and weight precision the cached embeddings were computed with, set by initialize_model
+_embedding_cache_variant = MODEL_NAME
+
+def _embedding_cache_key(text):
+    # Include the model variant so a persisted cache never serves vectors from another model,
+    # backend or quantized/half-precision copy of it
+    return hashlib.blake2b(f"{_embedding_cache_variant}\0{text}".encode('utf-8'), digest_size=16).digest()
+
+def _cache_get(key):
+    with _embedding_cache_lock:
+        embedding = _embedding_cache.get(key)
+        if embedding is not None:
+            _embedding_cache.move_to_end(key)
+        return embedding
+
+def _cache_put(key, embedding):
+    if EMBEDDING_CACHE_SIZE <= 0:
+        return
+    # Cached arrays are shared between requests, so they must never be mutated
+    embedding.setflags(write=False)
+    with _embedding_cache_lock:
+        _embedding_cache[key] = embedding
+        _embedding_cache.move_to_end(key)
+        while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+
+def clear_embedding_cache():
+    with _embedding_cache_lock:
+        _embedding_cache.clear()
+
+# Optional SQLite cache shared by every worker process and kept across restarts
+EMBEDDING_CACHE_DB = os.getenv('EMBEDDING_CACHE_DB', '')
+EMBEDDING_CACHE_SCHEMA = 'CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)'
+_embedding_db_write_lock = threading.Lock()
+
+def _db_get_many(keys):
+    """Return the persisted embeddings for whichever of `keys` are stored"""
+    if not EMBEDDING_CACHE_DB or not keys:
+        return {}
+    found = {}
+    try:
+        connection = sqlite_connection(EMBEDDING_CACHE_DB, EMBEDDING_CACHE_SCHEMA)
+        # Stay below SQLite's limit on bound parameters per statement
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = connection.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk)
+            for key, vector in rows:
+                found[bytes(key)] = np.frombuffer(vector, dtype=np.float32)
+    except sqlite3.Error as e:
+        logger.error("Error reading embedding cache: %s", e)
+    return found
+
+def _db_put_many(items):
+    if not EMBEDDING_CACHE_DB or not items:
+        return
+    try:
+        connection = sqlite_connection(EMBEDDING_CACHE_DB, EMBEDDING_CACHE_SCHEMA)
+        with _embedding_db_write_lock, connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)',
+                [(key, embedding.astype(np.float32, copy=False).tobytes()) for key, embedding in items]
+            )
+    except sqlite3.Error as e:
+        logger.error("Error writing embedding cache: %s", e)
+
+# Per-thread token buffers reused by every single-text forward pass
+MAX_SEQUENCE_LENGTH = 512
+_input_buffers = threading.local()
+
+def _single_inputs(input_ids):
+    """Copy one tokenized text into reusable buffers instead of allocating fresh tensors"""
+    buffers = getattr(_input_buffers, 'arrays', None)
+    if buffers is None:
+        # Page-locked on GPU hosts so the host-to-device copies can be asynchronous
+        pin = DEVICE.type == 'cuda'
+        buffers = {
+            'input_ids': torch.empty((1, MAX_SEQUENCE_LENGTH), dtype=torch.long, pin_memory=pin).numpy(),
+            # An unpadded single sequence attends to every token and has one segment
+            'attention_mask': torch.ones((1, MAX_SEQUENCE_LENGTH), dtype=torch.long, pin_memory=pin).numpy(),
+            'token_type_ids': torch.zeros((1, MAX_SEQUENCE_LENGTH), dtype=torch.long, pin_memory=pin).numpy(),
+        }
+        _input_buffers.arrays = buffers
+
+    length = len(input_ids)
+    buffers['input_ids'][0, :length] = input_ids
+    return {name: array[:, :length] for name, array in buffers.items()}
+
+def _batch_inputs(id_lists, length):
+    """Right-pad tokenized texts to `length` with the pad token and a zero attention mask"""
+    input_ids = np.full((len(id_lists), length), tokenizer.pad_token_id, dtype=np.int64)
+    attention_mask = np.zeros((len(id_lists), length), dtype=np.int64)
+    for row, ids in enumerate(id_lists):
+        input_ids[row, :len(ids)] = ids
+        attention_mask[row, :len(ids)] = 1
+    return {
+        'input_ids': input_ids,
+        'attention_mask': attention_mask,
+        'token_type_ids': np.zeros((len(id_lists), length), dtype=np.int64),
+    }
+
+# Texts are grouped into these length buckets before batching, and traced graphs
+# (which have fixed shapes) are padded up to them
+SEQUENCE_BUCKETS = (64, 128, 256, MAX_SEQUENCE_LENGTH)
+_traced_encoders = {}
+_traced_encoders_lock = threading.Lock()
+
+def _sequence_bucket(length):
+    return next(bucket for bucket in SEQUENCE_BUCKETS if bucket >= length)
+
+def _autocast():
+    """Run matmuls in float16 on the GPU; a no-op on CPU"""
+    return torch.autocast(device_type=DEVICE.type, dtype=torch.float16, enabled=DEVICE.type == 'cuda')
+
+def _to_device(array):
+    tensor = torch.from_numpy(array.astype(np.int64, copy=False))
+    if DEVICE.type == 'cuda':
+        # Stage through page-locked memory so the copy does not block the host
+        if not tensor.is_pinned():
+            tensor = tensor.pin_memory()
+        tensor = tensor.to(DEVICE, non_blocking=True)
+    return tensor
+
+def _get_traced_encoder(bucket):
+    """Trace the [CLS] encoder for one sequence length the first time that length is needed"""
+    with _traced_encoders_lock:
+        if bucket not in _traced_encoders:
+            logger.info("Tracing TorchScript encoder for sequence length %s...", bucket)
+            # Trace with some padding so the graph keeps the attention-mask path
+            example = tokenizer("warmup", return_tensors="pt", padding='max_length', max_length=bucket)
+            with torch.no_grad(), _autocast():
+                _traced_encoders[bucket] = torch.jit.trace(
+                    ClsEncoder(model).eval(),
+                    tuple(example[name].to(DEVICE) for name in ('input_ids', 'attention_mask', 'token_type_ids'))
+                )
+        return _traced_encoders[bucket]
+
+def _embed_ids(id_lists):
+    """Run a single forward pass over tokenized texts and return their [CLS] embeddings"""
+    longest = max(len(ids) for ids in id_lists)
+    encoder = None
+    if inference_backend == 'torchscript':
+        bucket = _sequence_bucket(longest)
+        inputs = _batch_inputs(id_lists, bucket)
+        encoder = _get_traced_encoder(bucket)
+    elif len(id_lists) == 1:
+        inputs = _single_inputs(id_lists[0])
+    else:
+        # Pad only up to the longest text in the batch
+        inputs = _batch_inputs(id_lists, longest)
+
+    if inference_backend == 'onnx':
+        # Feed NumPy arrays straight to ONNX Runtime, skipping torch entirely
+        return model.run(['cls_embedding'], inputs)[0]
+
+    # torch.from_numpy shares memory with the token buffers instead of copying them
+    input_ids, attention_mask, token_type_ids = (
+        _to_device(inputs[name]) for name in ('input_ids', 'attention_mask', 'token_type_ids')
+    )
+    # inference_mode also skips the version counters and view tracking that no_grad keeps
+    with torch.inference_mode(), _autocast():
+        if encoder is not None:
+            embeddings = encoder(input_ids, attention_mask, token_type_ids)
+        else:
+            outputs = model(input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids)
+            embeddings = outputs.last_hidden_state[:, 0]
+    # Only the [CLS] rows leave the device, in a single copy
+    return embeddings.float().cpu().numpy()
+
+def warmup_model():
+    """Create the oneDNN/cuBLAS primitives (and TorchScript traces) for every length bucket up front"""
     if tokenizer is None or model is None:
-        # Fallback to simple tokenization and random embeddings
-        words = text.lower().split()
-        # Create a simple random embedding of size 768 (same as BERT)
-        embedding = np.random.randn(1, 768)
-        return embedding.tolist()
-    
+        return
     try:
-        # Tokenize and get model outputs
-        inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-        with torch.no_grad():
-            outputs = model(**inputs)
-        
-        # Get the [CLS] token embeddings
-        embeddings = outputs.last_hidden_state[:, 0, :].numpy()
-        return embeddings.tolist()
+        # [CLS] <token> [SEP]; repeat the token so each sequence is exactly one bucket long,
+        # since tokenizing text would add the special tokens and overshoot into the next bucket
+        ids = encode_ids(["warmup"])['input_ids'][0]
+        cls_id, token_id, sep_id = ids[0], ids[1], ids[-1]
+        for length in SEQUENCE_BUCKETS:
+            # Bypasses the embedding cache so the forward pass always runs
+            _embed_ids([[cls_id] + [token_id] * (length - 2) + [sep_id]])
+        logger.info("Model warmed up for sequence lengths %s", SEQUENCE_BUCKETS)
     except Exception as e:
-        logger.error(f"Error getting embeddings: {str(e)}")
+        logger.error("Error warming up model: %s", e)
+
+def get_embeddings_batch(texts):
+    """Return the [CLS] embeddings of `texts` as a float32 array of shape (len(texts), 768)"""
+    if tokenizer is None or model is None:
+        # Fallback to random embeddings of size 768 (same as BERT)
+        return np.random.randn(len(texts), 768).astype(np.float32)
+
+    texts = [text.strip() for text in texts]
+    result = np.empty((len(texts), embedding_dim), dtype=np.float32)
+
+    # Serve cache hits directly and collect the positions of each distinct miss
+    missing = OrderedDict()
+    for i, text in enumerate(texts):
+        key = _embedding_cache_key(text)
+        cached = _cache_get(key)
+        if cached is not None:
+            result[i] = cached
+        else:
+            missing.setdefault(key, []).append(i)
+
+    # Then the persistent cache, promoting its hits into the in-process LRU
+    for key, embedding in _db_get_many(list(missing)).items():
+        result[missing.pop(key)] = embedding
+        _cache_put(key, embedding)
+
+    if not missing:
+        return result
+
+    try:
+        # Tokenize every miss in one call, then group them by length bucket so short
+        # texts are not padded to a long neighbour (attention cost grows with L^2)
+        pending = list(missing.items())
+        token_ids = encode_ids([texts[positions[0]] for _, positions in pending])['input_ids']
+        buckets = {}
+        for (key, positions), ids in zip(pending, token_ids):
+            buckets.setdefault(_sequence_bucket(len(ids)), []).append((key, positions, ids))
+
+        for items in buckets.values():
+            for start in range(0, len(items), MAX_BATCH_SIZE):
+                chunk = items[start:start + MAX_BATCH_SIZE]
+                embeddings = _embed_ids([ids for _, _, ids in chunk])
+                computed = []
+                for (key, positions, _), embedding in zip(chunk, embeddings):
+                    result[positions] = embedding
+                    embedding = embedding.copy()
+                    _cache_put(key, embedding)
+                    computed.append((key, embedding))
+                _db_put_many(computed)
+        return result
+    except Exception as e:
+        logger.error("Error getting embeddings: %s", e)
         # Fallback to random embeddings
-        embedding = np.random.randn(1, 768)
-        return embedding.tolist()
+        return np.random.randn(len(texts), 768).astype(np.float32)
+
+# Micro-batching: concurrent /api/analyze requests are queued and coalesced by background
+# inference threads into one batch, so N single-text requests cost one forward pass
+# instead of N. torch drops the GIL inside its kernels, so request threads keep
+# tokenizing and serializing while a batch runs.
+INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS', 1))
+# How long a batch waits for more requests after its first one arrives
+BATCH_WAIT_MS = float(os.getenv('BATCH_WAIT_MS', 5))
+_batch_queue = None
+_batcher_pid = None
+_batcher_lock = threading.Lock()
+
+def _run_batcher(batch_queue):
+    while True:
+        batch = [batch_queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + BATCH_WAIT_MS / 1000
+        while size < MAX_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = batch_queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+
+        try:
+            embeddings = get_embeddings_batch([text for texts, _ in batch for text in texts])
+        except Exception:
+            # Rerun the requests one at a time so only the one that caused the error fails
+            for texts, future in batch:
+                try:
+                    future.set_result(get_embeddings_batch(texts))
+                except Exception as e:
+                    future.set_exception(e)
+            continue
+
+        # Hand each request back its own rows
+        offset = 0
+        for texts, future in batch:
+            future.set_result(embeddings[offset:offset + len(texts)])
+            offset += len(texts)
+
+def _get_batch_queue():
+    """Return this process's batch queue, starting its inference threads on first use"""
+    global _batch_queue, _batcher_pid
+    # Threads do not survive fork, so each gunicorn worker starts its own
+    if _batcher_pid != os.getpid():
+        with _batcher_lock:
+            if _batcher_pid != os.getpid():
+                _batch_queue = queue.Queue()
+                for i in range(INFERENCE_WORKERS):
+                    threading.Thread(target=_run_batcher, args=(_batch_queue,), name=f'inference-{i}', daemon=True).start()
+                _batcher_pid = os.getpid()
+    return _batch_queue
+
+def embed_texts(texts):
+    """Return the embeddings of `texts`, queueing only the in-process cache misses for the micro-batcher"""
+    # Cache hits are answered on the request thread instead of waiting out the batching window
+    result = None
+    misses = []
+    for i, text in enumerate(texts):
+        cached = _cache_get(_embedding_cache_key(text.strip()))
+        if cached is None:
+            misses.append(i)
+            continue
+        if result is None:
+            result = np.empty((len(texts), cached.shape[0]), dtype=np.float32)
+        result[i] = cached
+    if not misses:
+        return result
+
+    future = Future()
+    _get_batch_queue().put(([texts[i] for i in misses], future))
+    if result is None:
+        return future.result()
+    result[misses] = future.result()
+    return result
+
+def get_embeddings(text):
+    """Return the [CLS] embedding of `text` as a float32 array of shape (1, 768)"""
+    return get_embeddings_batch([text])
 
 def process_data(df, preprocessing_steps):
-    """Process the data according to specified preprocessing steps"""
+    """Process the data according to specified preprocessing steps and return the processed DataFrame"""
     try:
         # Make a copy of the DataFrame to avoid modifying the original
         df_processed = df.copy()
@@ -98,12 +795,23 @@ def process_data(df, preprocessing_steps):
         # Handle missing values
         if preprocessing_steps.get('handle_missing'):
             strategy = preprocessing_steps['handle_missing'].get('strategy', 'mean')
+            # A single fillna over the frame with per-column statistics of the numeric block
             if strategy == 'mean':
-                df_processed = df_processed.fillna(df_processed.mean())
+                df_processed = df_processed.fillna(df_processed.mean(numeric_only=True))
             elif strategy == 'median':
-                df_processed = df_processed.fillna(df_processed.median())
+                df_processed = df_processed.fillna(df_processed.median(numeric_only=True))
             elif strategy == 'mode':
-                df_processed = df_processed.fillna(df_processed.mode().iloc[0])
+                # One value_counts per column instead of df.mode(), which builds a frame of every
+                # tied mode (all n values for unique columns) only for the first row to be kept
+                modes = {}
+                for col in df_processed.columns:
+                    counts = df_processed[col].value_counts(sort=False)
+                    if not counts.empty:
+                        modes[col] = counts.idxmax()
+                df_processed = df_processed.fillna(modes)
+                # Text columns with no values at all get a placeholder category
+                categorical_columns = df_processed.select_dtypes(include=['object']).columns
+                df_processed[categorical_columns] = df_processed[categorical_columns].fillna("Unknown")
             elif strategy == 'drop':
                 df_processed = df_processed.dropna()
         
@@ -114,31 +822,45 @@ def process_data(df, preprocessing_steps):
             
             numeric_columns = df_processed.select_dtypes(include=[np.number]).columns
             
+            # Build one row mask over every numeric column at once rather than re-filtering
+            # the frame per column; rows with missing values fail the comparisons and are dropped.
+            # pandas hands back its column-major block, so lay it out row-major for the row-wise test
+            values = np.ascontiguousarray(df_processed[numeric_columns].to_numpy(dtype=np.float64))
+            
             if method == 'zscore':
-                for col in numeric_columns:
-                    z_scores = np.abs((df_processed[col] - df_processed[col].mean()) / df_processed[col].std())
-                    df_processed = df_processed[z_scores < threshold]
+                stds = np.nanstd(values, axis=0, ddof=1)
+                stds[stds == 0] = 1
+                z_scores = np.abs((values - np.nanmean(values, axis=0)) / stds)
+                df_processed = df_processed[(z_scores < threshold).all(axis=1)]
             elif method == 'iqr':
-                for col in numeric_columns:
-                    Q1 = df_processed[col].quantile(0.25)
-                    Q3 = df_processed[col].quantile(0.75)
-                    IQR = Q3 - Q1
-                    df_processed = df_processed[
-                        (df_processed[col] >= Q1 - 1.5 * IQR) & 
-                        (df_processed[col] <= Q3 + 1.5 * IQR)
-                    ]
+                Q1, Q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+                IQR = Q3 - Q1
+                df_processed = df_processed[
+                    ((values >= Q1 - 1.5 * IQR) & (values <= Q3 + 1.5 * IQR)).all(axis=1)
+                ]
         
         # Normalize/Scale data
         if preprocessing_steps.get('normalize'):
             method = preprocessing_steps['normalize'].get('method', 'minmax')
             numeric_columns = df_processed.select_dtypes(include=[np.number]).columns
             
-            if method == 'minmax':
-                for col in numeric_columns:
-                    df_processed[col] = (df_processed[col] - df_processed[col].min()) / (df_processed[col].max() - df_processed[col].min())
-            elif method == 'standard':
-                for col in numeric_columns:
-                    df_processed[col] = (df_processed[col] - df_processed[col].mean()) / df_processed[col].std()
+            # Scale the whole numeric block as one ndarray, bypassing pandas alignment;
+            # the nan-aware reductions skip missing values like pandas does, and constant
+            # columns are left at zero instead of becoming NaN. Centering runs in float64 so
+            # large-magnitude columns (e.g. epoch seconds) keep their resolution; only the
+            # scaled result is stored as float32
+            if len(numeric_columns) and len(df_processed) and method in ('minmax', 'standard'):
+                values = df_processed[numeric_columns].to_numpy(dtype=np.float64)
+                if method == 'minmax':
+                    offsets = np.nanmin(values, axis=0)
+                    scales = np.nanmax(values, axis=0) - offsets
+                else:
+                    offsets = np.nanmean(values, axis=0)
+                    scales = np.nanstd(values, axis=0, ddof=1)
+                scales[scales == 0] = 1
+                values -= offsets
+                values /= scales
+                df_processed[numeric_columns] = values.astype(np.float32, copy=False)
         
         # Encode categorical variables
         if preprocessing_steps.get('encode_categorical'):
@@ -146,17 +868,16 @@ def process_data(df, preprocessing_steps):
             categorical_columns = df_processed.select_dtypes(include=['object']).columns
             
             if method == 'onehot':
-                df_processed = pd.get_dummies(df_processed, columns=categorical_columns)
+                # One byte per indicator cell; cat.codes in the label branch are sized to the category count
+                df_processed = pd.get_dummies(df_processed, columns=categorical_columns, dtype=bool)
             elif method == 'label':
                 for col in categorical_columns:
                     df_processed[col] = df_processed[col].astype('category').cat.codes
         
-        # Convert to dictionary format for JSON serialization
-        result = df_processed.to_dict(orient='records')
-        return result
+        return df_processed
         
     except Exception as e:
-        logger.error(f"Error in process_data: {str(e)}")
+        logger.error("Error in process_data: %s", e)
         raise Exception(f"Error processing data: {str(e)}")
 
 @app.route('/api/ingest-data', methods=['POST'])
@@ -174,22 +895,39 @@ def ingest_data():
 
         data_type = request.form.get('dataType', 'csv')
         preprocessing_steps = json.loads(request.form.get('preprocessing', '{}'))
+        # Processed output keeps the input format unless the client asks for another one
+        output_format = request.form.get('outputFormat', data_type)
+        if output_format not in OUTPUT_FORMATS:
+            return jsonify({'error': 'Unsupported output format'}), 400
+        if output_format == 'parquet' and pa is None:
+            return jsonify({'error': 'Parquet output requires pyarrow'}), 400
+
+        # Uploads are capped by MAX_CONTENT_LENGTH, so parse them from memory while the copy on disk is written
+        raw = file.stream.read()
+        
+        # Identical uploads with identical options reuse the earlier result
+        ingest_key = ingest_cache_key(raw, data_type, output_format, preprocessing_steps)
+        cached_summary = get_cached_ingest(ingest_key)
+        if cached_summary is not None:
+            return jsonify({
+                'message': 'Data processed successfully',
+                'summary': cached_summary
+            })
 
         # Save the file
         filename = secure_filename(file.filename)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         saved_filename = f"{timestamp}_{filename}"
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], saved_filename)
-        file.save(filepath)
+        save_upload_in_background(raw, filepath)
 
         # Read the file based on its type
         try:
             if data_type == 'csv':
-                df = pd.read_csv(filepath)
+                df = read_csv_file(io.BytesIO(raw))
             elif data_type == 'json':
-                # Read JSON file with proper handling
-                with open(filepath, 'r') as f:
-                    json_data = json.load(f)
+                # Read JSON file with proper handling; orjson's decode errors subclass json.JSONDecodeError
+                json_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
                 
                 # Convert JSON data to DataFrame
                 if isinstance(json_data, list):
@@ -206,55 +944,52 @@ def ingest_data():
                     return jsonify({'error': 'No data found in JSON file.'}), 400
                 
                 # Log the DataFrame structure
-                logger.info(f"DataFrame columns: {df.columns.tolist()}")
-                logger.info(f"DataFrame shape: {df.shape}")
+                logger.info("DataFrame columns: %s", df.columns.tolist())
+                logger.info("DataFrame shape: %s", df.shape)
                 
             elif data_type in ['xls', 'xlsx']:
-                df = pd.read_excel(filepath)
+                df = read_excel_file(io.BytesIO(raw))
             else:
                 return jsonify({'error': 'Unsupported file type'}), 400
         except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {str(e)}")
+            logger.error("JSON decode error: %s", e)
             return jsonify({'error': f'Invalid JSON format: {str(e)}'}), 400
         except Exception as e:
-            logger.error(f"Error reading file: {str(e)}")
+            logger.error("Error reading file: %s", e)
             return jsonify({'error': f'Error reading file: {str(e)}'}), 400
 
         # Process the data
         try:
-            processed_data = process_data(df, preprocessing_steps)
+            df_processed = process_data(df, preprocessing_steps)
         except Exception as e:
-            logger.error(f"Error processing data: {str(e)}")
+            logger.error("Error processing data: %s", e)
             return jsonify({'error': f'Error processing data: {str(e)}'}), 500
 
         # Save processed data
-        processed_filename = f"processed_{saved_filename}"
+        processed_filename = f"processed_{ingest_key}_{os.path.splitext(filename)[0]}{OUTPUT_FORMATS[output_format]}"
         processed_filepath = os.path.join(app.config['UPLOAD_FOLDER'], processed_filename)
         
         try:
-            # Convert processed data back to DataFrame with proper index
-            df_processed = pd.DataFrame(processed_data)
-            
-            if data_type == 'csv':
-                df_processed.to_csv(processed_filepath, index=False)
-            elif data_type == 'json':
-                df_processed.to_json(processed_filepath, orient='records')
-            elif data_type in ['xls', 'xlsx']:
-                df_processed.to_excel(processed_filepath, index=False)
+            write_processed_file(df_processed, processed_filepath, output_format)
         except Exception as e:
-            logger.error(f"Error saving processed file: {str(e)}")
+            logger.error("Error saving processed file: %s", e)
             return jsonify({'error': f'Error saving processed file: {str(e)}'}), 500
 
-        # Return summary statistics
+        # Return summary statistics, classifying columns from a single dtypes lookup
+        dtypes = df_processed.dtypes
+        is_numeric = dtypes.map(lambda dtype: pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype))
+        missing_values = df_processed.isna().sum()
         summary = {
-            'original_rows': len(df),
-            'processed_rows': len(df_processed),
-            'columns': list(df_processed.columns),
-            'numeric_columns': list(df_processed.select_dtypes(include=[np.number]).columns),
-            'categorical_columns': list(df_processed.select_dtypes(include=['object']).columns),
-            'missing_values': df_processed.isnull().sum().to_dict(),
+            'original_rows': df.shape[0],
+            'processed_rows': df_processed.shape[0],
+            'columns': dtypes.index.tolist(),
+            'numeric_columns': dtypes.index[is_numeric.to_numpy(dtype=bool)].tolist(),
+            'categorical_columns': dtypes.index[(dtypes == object).to_numpy()].tolist(),
+            # Native ints straight from the counts array, without boxing one NumPy scalar per column
+            'missing_values': dict(zip(missing_values.index, missing_values.to_numpy().tolist())),
             'file_path': processed_filepath
         }
+        put_cached_ingest(ingest_key, summary)
 
         return jsonify({
             'message': 'Data processed successfully',
@@ -262,28 +997,53 @@ def ingest_data():
         })
 
     except Exception as e:
-        logger.error(f"Error in data ingestion: {str(e)}")
+        logger.error("Error in data ingestion: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze_text():
     try:
         data = request.get_json()
-        text = data.get('text', '')
+        # Accept either a single `text` or a list of `texts` embedded in one batch
+        texts = data.get('texts')
+        if texts is None:
+            text = data.get('text', '')
+            if not text:
+                return jsonify({'error': 'No text provided'}), 400
+            if not isinstance(text, str):
+                return jsonify({'error': 'text must be a string'}), 400
+            texts = [text]
+        elif not isinstance(texts, list) or not texts or not all(isinstance(t, str) and t for t in texts):
+            return jsonify({'error': 'texts must be a non-empty list of strings'}), 400
         
-        if not text:
-            return jsonify({'error': 'No text provided'}), 400
+        if not model_ready.is_set():
+            start_model_loading()
+            response = jsonify({'error': 'The model is still loading, please try again shortly'})
+            response.headers['Retry-After'] = '5'
+            return response, 503
         
         # Get embeddings
-        embeddings = get_embeddings(text)
+        embedding_array = embed_texts(texts)
+        
+        # Calculate some basic statistics; across a single embedding they are the
+        # vector itself and zeros, so skip the reductions in that case
+        if embedding_array.shape[0] > 1:
+            mean_embedding = np.mean(embedding_array, axis=0)
+            std_embedding = np.std(embedding_array, axis=0)
+        else:
+            mean_embedding = embedding_array[0]
+            std_embedding = np.zeros_like(mean_embedding)
         
-        # Calculate some basic statistics
-        embedding_array = np.array(embeddings)
-        mean_embedding = np.mean(embedding_array, axis=0).tolist()
-        std_embedding = np.std(embedding_array, axis=0).tolist()
+        if request.accept_mimetypes.best == 'application/octet-stream':
+            # Raw little-endian float32 rows: the embeddings followed by the mean and std rows
+            payload = np.vstack([embedding_array, mean_embedding, std_embedding]).astype('<f4', copy=False)
+            response = Response(payload.tobytes(), mimetype='application/octet-stream')
+            response.headers['X-Embedding-Shape'] = f"{embedding_array.shape[0]},{embedding_array.shape[1]}"
+            response.headers['X-Embedding-Dtype'] = 'float32'
+            return response
         
         return jsonify({
-            'embeddings': embeddings,
+            'embeddings': embedding_array,
             'statistics': {
                 'mean': mean_embedding,
                 'std': std_embedding
@@ -291,7 +1051,7 @@ def analyze_text():
         })
     
     except Exception as e:
-        logger.error(f"Error processing request: {str(e)}")
+        logger.error("Error processing request: %s", e)
         return jsonify({'error': str(e)}), 500
 
 def analyze_timeseries(data):
@@ -311,61 +1071,74 @@ def analyze_timeseries(data):
                 raise ValueError("Each item must have a 'step' field")
             if 'delay' not in item:
                 raise ValueError("Each item must have a 'delay' field")
-            
-            # Convert delay to float if it's a string
-            if isinstance(item['delay'], str):
-                try:
-                    item['delay'] = float(item['delay'])
-                except ValueError:
-                    raise ValueError(f"Delay value '{item['delay']}' cannot be converted to a number")
         
-        # Convert timestamps to datetime objects
-        for item in data:
-            try:
-                item['timestamp'] = datetime.fromisoformat(item['timestamp'].replace('Z', '+00:00'))
-            except ValueError as e:
-                raise ValueError(f"Invalid timestamp format: {item['timestamp']}. Expected ISO format (YYYY-MM-DDTHH:mm:ss)")
+        # Gather each field into a column once and convert whole columns instead of item by item
+        frame = pd.DataFrame({
+            'timestamp': [item['timestamp'] for item in data],
+            'step': [item['step'] for item in data],
+            'delay': [item['delay'] for item in data],
+        })
+        
+        # Convert delays (numbers or numeric strings) to floats
+        delays_numeric = pd.to_numeric(frame['delay'], errors='coerce')
+        invalid = delays_numeric.isna()
+        if invalid.any():
+            raise ValueError(f"Delay value '{frame['delay'][invalid].iloc[0]}' cannot be converted to a number")
+        frame['delay'] = delays_numeric.astype(np.float64)
+        
+        # Convert timestamps to datetimes
+        timestamps = pd.to_datetime(frame['timestamp'], format='ISO8601', utc=True, errors='coerce')
+        invalid = timestamps.isna()
+        if invalid.any():
+            raise ValueError(f"Invalid timestamp format: {frame['timestamp'][invalid].iloc[0]}. Expected ISO format (YYYY-MM-DDTHH:mm:ss)")
+        frame['timestamp'] = timestamps
         
         # Sort by timestamp
-        data.sort(key=lambda x: x['timestamp'])
+        frame = frame.sort_values('timestamp', kind='stable', ignore_index=True)
+        steps = frame['step'].tolist()
+        step_delays = frame['delay'].to_numpy()
         
         # Calculate delays between steps
-        delays = []
-        for i in range(1, len(data)):
-            delay = (data[i]['timestamp'] - data[i-1]['timestamp']).total_seconds() / 3600  # Convert to hours
-            delays.append(delay)
-        
-        # Calculate bottleneck impact scores
-        bottlenecks = []
-        for i, step in enumerate(data):
-            if i == 0:
-                continue
-            impact = float(step['delay']) / max(delays) if max(delays) > 0 else 0
-            bottlenecks.append({
-                'step': step['step'],
-                'impact': impact,
-                'delay': float(step['delay'])
-            })
+        # One subtraction over the int64 nanosecond values, without a Timedelta per row
+        timestamps_ns = frame['timestamp'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        delays = np.diff(timestamps_ns) / 3.6e12  # Convert to hours
         
-        # Sort bottlenecks by impact
-        bottlenecks.sort(key=lambda x: x['impact'], reverse=True)
+        # Calculate bottleneck impact scores against the longest gap, computed once
+        max_delay = delays.max(initial=0)
+        impacts = step_delays[1:] / max_delay if max_delay > 0 else np.zeros(len(delays))
+        
+        # Rank bottlenecks by impact on the arrays (stable, so ties keep their time order)
+        # and only then build the response dicts
+        order = np.argsort(-impacts, kind='stable')
+        bottlenecks = [
+            {'step': steps[i + 1], 'impact': impact, 'delay': delay}
+            for i, impact, delay in zip(order.tolist(), impacts[order].tolist(), step_delays[1:][order].tolist())
+        ]
         
         # Detect anomalies using Isolation Forest
-        delay_values = np.array([float(item['delay']) for item in data]).reshape(-1, 1)
-        scaler = StandardScaler()
-        delay_values_scaled = scaler.fit_transform(delay_values)
-        
-        iso_forest = IsolationForest(contamination=0.1, random_state=42)
-        anomalies = iso_forest.fit_predict(delay_values_scaled)
-        
-        # Identify anomalous steps
-        anomalous_steps = []
-        for i, (is_anomaly, step) in enumerate(zip(anomalies, data)):
-            if is_anomaly == -1:  # -1 indicates anomaly
-                anomalous_steps.append({
-                    'step': step['step'],
-                    'description': f"Unusual delay pattern detected: {step['delay']} hours"
-                })
+        # C-contiguous float32 is the layout and dtype IsolationForest validates to, so it is not copied again
+        delay_values = step_delays.astype(np.float32)
+        # Standardize the single column inline rather than through a fitted StandardScaler
+        delay_std = delay_values.std()
+        if delay_std:
+            delay_values -= delay_values.mean()
+            delay_values /= delay_std
+        delay_values = delay_values.reshape(-1, 1)
+        
+        # Half the default trees is plenty to isolate outliers in a single feature
+        iso_forest = IsolationForest(
+            n_estimators=50, max_samples=min(256, len(delay_values)), contamination=0.1, random_state=42
+        )
+        anomalies = iso_forest.fit_predict(delay_values)
+        
+        # Identify anomalous steps (-1 indicates anomaly)
+        anomalous_steps = [
+            {
+                'step': steps[i],
+                'description': f"Unusual delay pattern detected: {step_delays[i]} hours"
+            }
+            for i in np.flatnonzero(anomalies == -1)
+        ]
         
         # Generate recommendations
         recommendations = []
@@ -399,9 +1172,17 @@ def analyze_timeseries(data):
         }
         
     except Exception as e:
-        logger.error(f"Error in time series analysis: {str(e)}")
+        logger.error("Error in time series analysis: %s", e)
         raise ValueError(str(e))
  
+@app.route('/api/warmup', methods=['POST'])
+def warmup():
+    """Start loading the model if it is not loaded yet and report whether it is ready"""
+    if model_ready.is_set():
+        return jsonify({'status': 'ready', 'model_loaded': model is not None})
+    start_model_loading()
+    return jsonify({'status': 'loading'}), 202
+
 @app.route('/api/analyze-timeseries', methods=['POST'])
 def analyze_timeseries_endpoint():
     try:
@@ -409,15 +1190,29 @@ def analyze_timeseries_endpoint():
         if not data or 'data' not in data:
             return jsonify({'error': 'No data provided'}), 400
         
+        # The analysis is deterministic, so identical request bodies share one cached response
+        cache_key = b'timeseries:' + hashlib.blake2b(request.get_data(), digest_size=16).digest()
+        cached = get_cached_response(cache_key)
+        if cached is not None:
+            return Response(cached, mimetype='application/json')
+        
         results = analyze_timeseries(data['data'])
-        return jsonify(results)
+        response = jsonify(results)
+        put_cached_response(cache_key, response.get_data())
+        return response
     
     except Exception as e:
-        logger.error(f"Error processing request: {str(e)}")
+        logger.error("Error processing request: %s", e)
         return jsonify({'error': str(e)}), 500
         
-# Initialize the model when the server starts
-initialize_model()
+# Initialize the model when the server starts; with LAZY_MODEL_LOAD it is loaded on a
+# background thread instead, started by the first /api/analyze or /api/warmup request
+# (or, under gunicorn, when each worker starts)
+if not LAZY_MODEL_LOAD:
+    initialize_model()
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000, host='0.0.0.0')  # Allow external connections 
\ No newline at end of file
+    if LAZY_MODEL_LOAD:
+        start_model_loading()
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
+    app.run(debug=os.getenv('FLASK_DEBUG', 'false').lower() in ('1', 'true', 'yes'), port=5000, host='0.0.0.0')  # Allow external connections 
\ No newline at end of file
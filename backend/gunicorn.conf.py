@@ -0,0 +1,68 @@
+# Gunicorn settings for serving the backend, picked up automatically when
+# gunicorn is started from this directory (e.g. `gunicorn app:app`).
+import gc
+import os
+import sys
+
+
+def _uses_cuda():
+    """Whether app.py will put the model on the GPU (same default as its DEVICE setting)"""
+    device = os.getenv('DEVICE')
+    if device is not None:
+        return device.startswith('cuda')
+    # Ask NVML instead of the CUDA driver, so the check leaves nothing initialized for the workers to inherit
+    os.environ.setdefault('PYTORCH_NVML_BASED_CUDA_CHECK', '1')
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+
+use_cuda = _uses_cuda()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Threaded workers: requests in one worker overlap while torch releases the GIL.
+# On the GPU every worker holds its own copy of the model, so default to a single one
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', 1 if use_cuda else os.cpu_count() or 1))
+threads = int(os.getenv('GUNICORN_THREADS', 2))
+
+# Import the app (and load BERT) once in the master so workers share the
+# weights through copy-on-write instead of each loading their own copy.
+# A CUDA context cannot be used across fork, so on the GPU each worker
+# imports the app and loads the model onto the device itself
+preload_app = not use_cuda
+
+# Workers touch their heartbeat file every few seconds; keep it on tmpfs so a slow disk cannot stall them
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+# Model loading and warmup can take a while on cold starts
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+
+# Split the cores between workers so their MKL/oneDNN thread pools do not oversubscribe the CPU
+os.environ.setdefault('TORCH_NUM_THREADS', str(max(1, (os.cpu_count() or 1) // workers)))
+
+# OpenMP thread pools created in the master do not survive fork, so the
+# master skips the warmup and every worker runs it after it starts
+warmup_workers = os.getenv('WARMUP_MODEL', 'true').lower() in ('1', 'true', 'yes')
+os.environ['WARMUP_MODEL'] = 'false'
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported (when preloaded) and before any worker is forked.
+    # Move everything allocated so far into the permanent generation, so the workers' garbage
+    # collections never write to those objects' headers and copy the shared pages
+    gc.collect()
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    app_module = sys.modules[worker.wsgi.import_name]
+    if app_module.LAZY_MODEL_LOAD:
+        # Nothing was loaded in the master; load in the background so the worker starts serving right away
+        app_module.start_model_loading(warmup=warmup_workers)
+    elif warmup_workers:
+        app_module.warmup_model()